@@ -0,0 +1,65 @@
+"""Registry of pluggable dispatch backends.
+
+A backend is a callable ``dispatch(scheduler, orders, current_time)`` that
+returns a list of ``(rider, [orders])`` assignments, or None when it found no
+solution and the scheduler should fall back to greedy. Backends are
+registered as "module:attribute" strings and imported on first use, so heavy
+solver dependencies (e.g. OR-Tools) cost nothing until a run selects them.
+"""
+import importlib
+import importlib.util
+from typing import Callable, Dict, List, Sequence, Union
+
+_BACKENDS: Dict[str, Union[str, Callable]] = {}
+_REQUIRES: Dict[str, Sequence[str]] = {}
+_LOADED: Dict[str, Callable] = {}
+
+
+def register_backend(name: str, target: Union[str, Callable], requires: Sequence[str] = ()):
+    """Register `target` (a callable or a lazy "module:attribute" path) under `name`.
+
+    `requires` lists top-level modules the backend needs; they are checked
+    with importlib.util.find_spec, which does not import them.
+    """
+    _BACKENDS[name] = target
+    _REQUIRES[name] = tuple(requires)
+    _LOADED.pop(name, None)
+
+
+def unregister_backend(name: str):
+    for registry in (_BACKENDS, _REQUIRES, _LOADED):
+        registry.pop(name, None)
+
+
+def registered_backends() -> List[str]:
+    return list(_BACKENDS)
+
+
+def missing_requirements(name: str) -> List[str]:
+    return [mod for mod in _REQUIRES.get(name, ()) if importlib.util.find_spec(mod) is None]
+
+
+def is_available(name: str) -> bool:
+    return name in _BACKENDS and not missing_requirements(name)
+
+
+def available_backends() -> List[str]:
+    return [name for name in _BACKENDS if is_available(name)]
+
+
+def get_backend(name: str) -> Callable:
+    """Return the dispatch callable for `name`, importing it on first use."""
+    if name in _LOADED:
+        return _LOADED[name]
+    if name not in _BACKENDS:
+        raise KeyError("Unknown dispatch backend %r (registered: %s)" % (name, ', '.join(sorted(_BACKENDS))))
+    target = _BACKENDS[name]
+    if isinstance(target, str):
+        module_name, _, attr = target.partition(':')
+        target = getattr(importlib.import_module(module_name), attr)
+    _LOADED[name] = target
+    return target
+
+
+register_backend('greedy', 'dispatch_sim.backends.greedy:dispatch')
+register_backend('ortools', 'dispatch_sim.backends.ortools_vrptw:dispatch', requires=('ortools',))
@@ -0,0 +1,70 @@
+"""Greedy batch dispatch: earliest-deadline-first batching per idle rider,
+re-sequenced with insertion + 2-opt."""
+from typing import List
+from ..models import Order, RiderState, OrderStatus
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def dispatch(scheduler, orders: List[Order], current_time: int):
+    assignments = []
+    # Build a mutable pool of unassigned orders
+    candidate_pool = [o for o in orders if o.assigned_rider is None and o.status == OrderStatus.PENDING]
+    for r in scheduler.riders:
+        if not (r.online and r.state == RiderState.IDLE and r.can_take()):
+            continue
+        # Sort by earliest window_end (deadline), then request_time
+        candidate_orders = sorted(
+            candidate_pool,
+            key=lambda o: (o.window_end if o.window_end is not None else float('inf'), o.request_time)
+        )
+        batch = []
+        current_time_cursor = current_time
+        current_loc = r.location
+        for o in candidate_orders:
+            if len(batch) >= r.capacity:
+                break
+            # Estimate arrival time at this order
+            travel = int(round(scheduler.planner.travel_time_minutes(current_loc, o.dropoff)))
+            eta = current_time_cursor + travel
+            # Check time window feasibility
+            if o.window_end is not None and eta > o.window_end + 5:
+                continue
+            batch.append((o, eta))
+            current_time_cursor = eta
+            current_loc = o.dropoff
+        if batch:
+            # Route optimization: get dropoff points and re-sequence with insertion + 2-opt
+            dropoffs = [o.dropoff for o, _ in batch]
+            route = scheduler.planner.insertion_heuristic(r.location, dropoffs)
+            route = scheduler.planner.two_opt(route)
+            # Recompute ETAs for optimized route
+            current_time_cursor = current_time
+            current_loc = r.location
+            batch_final = []
+            # orders may share a dropoff point; map each route stop to a distinct order
+            unrouted = [o for o, _ in batch]
+            for pt in route:
+                o = next(x for x in unrouted if x.dropoff == pt)
+                unrouted.remove(o)
+                travel = int(round(scheduler.planner.travel_time_minutes(current_loc, pt)))
+                eta = current_time_cursor + travel
+                if o.window_end is not None and eta > o.window_end + 5:
+                    continue
+                batch_final.append((o, eta))
+                current_time_cursor = eta
+                current_loc = pt
+            # Assign
+            for (o, eta) in batch_final:
+                o.assigned_rider = r.id
+                o.status = OrderStatus.ASSIGNED
+                o.est_delivery_time = eta
+                r.assigned_orders.append(o)
+            r.state = RiderState.ASSIGNED
+            logger.info("Assigned batch %s to rider %s", [o.id for o, _ in batch_final], r.id)
+            assignments.append((r, [o for o, _ in batch_final]))
+            # Remove assigned orders from candidate pool
+            assigned_ids = set(o.id for o, _ in batch_final)
+            candidate_pool = [o for o in candidate_pool if o.id not in assigned_ids]
+    return assignments
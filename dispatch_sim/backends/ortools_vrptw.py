@@ -0,0 +1,107 @@
+"""Global VRPTW dispatch with OR-Tools.
+
+Imported lazily through the backend registry; importing this module loads
+the OR-Tools native extension.
+"""
+from typing import List
+from ortools.constraint_solver import pywrapcp
+from ..models import Order, RiderState, OrderStatus
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def dispatch(scheduler, orders: List[Order], current_time: int):
+    """Solve one VRPTW over all pending orders; None if no solution was found."""
+    # Only consider orders that are pending for assignment
+    unassigned = [o for o in orders if o.assigned_rider is None and o.status == OrderStatus.PENDING]
+
+    # sort by deadline (appointment first)
+    def deadline(o: Order):
+        return o.window_end if o.window_end is not None else current_time
+
+    unassigned.sort(key=deadline)
+
+    # Only consider online and idle riders
+    idle_riders = [r for r in scheduler.riders if r.online and r.state == RiderState.IDLE and r.can_take()]
+    if not idle_riders or not unassigned:
+        return []
+
+    depots = [(0.0, 0.0)]
+    dropoffs = [o.dropoff for o in unassigned]
+    locations = depots + dropoffs
+    num_depots = len(depots)
+    num_dropoffs = len(dropoffs)
+    num_nodes = len(locations)
+
+    dist_matrix = [[int(scheduler.planner.travel_time_minutes(locations[i], locations[j])) for j in range(num_nodes)] for i in range(num_nodes)]
+
+    manager = pywrapcp.RoutingIndexManager(num_nodes, len(idle_riders), 0)
+    routing = pywrapcp.RoutingModel(manager)
+
+    def time_callback(from_index, to_index):
+        return dist_matrix[manager.IndexToNode(from_index)][manager.IndexToNode(to_index)]
+
+    transit_callback_index = routing.RegisterTransitCallback(time_callback)
+    routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
+
+    routing.AddDimension(transit_callback_index, 30, 99999, False, "Time")
+    time_dimension = routing.GetDimensionOrDie("Time")
+
+    for i in range(num_nodes):
+        if i == 0:
+            time_dimension.CumulVar(manager.NodeToIndex(0)).SetRange(current_time, 99999)
+            logger.debug("Depot : time window [%s, 99999]", current_time)
+        else:
+            o = unassigned[i - 1]
+            start = o.window_start if o.window_start is not None else o.request_time
+            end = o.window_end if o.window_end is not None else 99999
+            time_dimension.CumulVar(manager.NodeToIndex(i)).SetRange(start, end)
+            logger.debug("Order %s: time window [%s, %s], dropoff %s", o.id, start, end, o.dropoff)
+
+    # Add capacity constraint
+    def demand_callback(from_index):
+        node = manager.IndexToNode(from_index)
+        if node == 0:
+            return 0  # depot
+        else:
+            return 1  # each order has demand 1
+    demand_callback_index = routing.RegisterUnaryTransitCallback(demand_callback)
+    routing.AddDimensionWithVehicleCapacity(
+        demand_callback_index,
+        0,  # null capacity slack
+        [r.capacity for r in idle_riders],  # vehicle capacities
+        True,  # start cumul to zero
+        "Capacity"
+    )
+    capacity_dimension = routing.GetDimensionOrDie("Capacity")
+
+    search_parameters = pywrapcp.DefaultRoutingSearchParameters()
+    search_parameters.time_limit.seconds = 10
+    search_parameters.log_search = True  # 启用详细求解日志
+    solution = routing.SolveWithParameters(search_parameters)
+
+    if solution:
+        assignments = []
+        for vidx, rider in enumerate(idle_riders):
+            rider.assigned_orders = []
+            idx = routing.Start(vidx)
+            batch_orders = []
+            while not routing.IsEnd(idx):
+                node = manager.IndexToNode(idx)
+                if node >= 1:
+                    order = unassigned[node - 1]
+                    eta = solution.Min(time_dimension.CumulVar(idx))
+                    # 可选：if order.window_end is not None and eta > order.window_end: continue
+                    order.assigned_rider = rider.id
+                    order.status = OrderStatus.ASSIGNED
+                    order.est_delivery_time = eta
+                    batch_orders.append(order)
+                idx = solution.Value(routing.NextVar(idx))
+            if batch_orders:
+                rider.state = RiderState.ASSIGNED
+                rider.assigned_orders = batch_orders
+                logger.info("Assigned batch %s to rider %s", [o.id for o in batch_orders], rider.id)
+                assignments.append((rider, batch_orders))
+        return assignments
+    return None
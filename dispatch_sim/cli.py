@@ -2,35 +2,49 @@ try:
     # when run as a package module
     from .engine import SimulationEngine, Event
     from .models import Rider, Order
+    from .replication import random_stream
 except Exception:
     # when run as a script, add project root to sys.path and import absolute
     import os, sys
     sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
     from dispatch_sim.engine import SimulationEngine, Event
     from dispatch_sim.models import Rider, Order
+    from dispatch_sim.replication import random_stream
 import random
 import math
 import logging
 import os
 
-# configure module-level logging to write to simulation.log in project root
-logger = logging.getLogger()
-if not logger.handlers:
-    log_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'simulation.log'))
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOG_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'simulation.log'))
+
+
+def configure_logging(log_path: str = DEFAULT_LOG_PATH, level=logging.INFO):
+    """Send log records to `log_path` (simulation.log in the project root by default).
+
+    Called by the CLI entry point only; importing the package leaves logging alone.
+    """
+    root = logging.getLogger()
+    if any(isinstance(h, logging.FileHandler) and h.baseFilename == os.path.abspath(log_path) for h in root.handlers):
+        return
     fh = logging.FileHandler(log_path)
     formatter = logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s')
     fh.setFormatter(formatter)
-    logger.addHandler(fh)
-    logger.setLevel(logging.INFO)
+    root.addHandler(fh)
+    root.setLevel(level)
+
 
+def poisson_arrivals(rate_per_minute: float, duration_minutes: int, rng=random):
+    """Generate arrival times (in minutes) for Poisson process with given rate.
 
-def poisson_arrivals(rate_per_minute: float, duration_minutes: int):
-    """Generate arrival times (in minutes) for Poisson process with given rate."""
+    `rng` is anything with a random() method; defaults to the global `random` module.
+    """
     t = 0
     arrivals = []
     while t < duration_minutes:
         # exponential inter-arrival
-        u = random.random()
+        u = rng.random()
         if u == 0:
             break
         inter = -math.log(u) / rate_per_minute
@@ -40,9 +54,15 @@ def poisson_arrivals(rate_per_minute: float, duration_minutes: int):
     return arrivals
 
 
-def run_demo():
-    logger.info("Starting simulation demo")
-    sim = SimulationEngine()
+def build_demo_scenario(seed=None, strategy='auto', rate_per_minute: float = 2.0) -> SimulationEngine:
+    """Build the demo scenario: four riders with staggered shifts, Poisson
+    immediate orders over 60 minutes and two appointment orders.
+
+    With a seed the order arrivals come from a dedicated seeded stream
+    (common random numbers across configurations); without one they use the
+    global `random` module.
+    """
+    sim = SimulationEngine(strategy=strategy)
     # add riders
     riders = [
         Rider(location=(0.0, 0.0), base_location=(0.0, 0.0), star=4, capacity=4),
@@ -63,7 +83,8 @@ def run_demo():
     # 第4个骑手第20分钟上线
     sim.schedule_event(Event(20, 'rider_online', riders[3]))
     # schedule a few poisson immediate orders over 60 minutes
-    arrivals = poisson_arrivals(rate_per_minute=2.0, duration_minutes=60)
+    order_rng = random if seed is None else random_stream(seed, 'orders')
+    arrivals = poisson_arrivals(rate_per_minute=rate_per_minute, duration_minutes=60, rng=order_rng)
     for i, at in enumerate(arrivals):
         sim.add_order(Order(pickup=(0.0, 0.0), dropoff=(2.0 + 0.1 * i, 2.0 + 0.1 * i), request_time=at, window_start=at, window_end=at+10, order_type='immediate'))
     # add an appointment order with a window
@@ -75,6 +96,12 @@ def run_demo():
     appt2.window_start = 20
     appt2.window_end = 40
     sim.add_order(appt2)
+    return sim
+
+
+def run_demo():
+    logger.info("Starting simulation demo")
+    sim = build_demo_scenario()
 
     # run simulation until minute 30
     sim_time = 60
@@ -87,4 +114,5 @@ def run_demo():
 
 
 if __name__ == '__main__':
+    configure_logging()
     run_demo()
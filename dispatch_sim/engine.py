@@ -1,5 +1,7 @@
-from typing import List, Any
+from typing import List, Any, Callable, Iterable, Optional
+import bisect
 import heapq
+import itertools
 from .models import Rider, Order, RiderState, OrderStatus
 from .scheduler import Scheduler
 from .path_planner import PathPlanner
@@ -10,13 +12,17 @@ logger = logging.getLogger(__name__)
 
 
 class Event:
+    # tie-breaker so events due in the same minute pop in the order they were created
+    _seq = itertools.count()
+
     def __init__(self, time: int, kind: str, payload: Any = None):
         self.time = time
         self.kind = kind
         self.payload = payload
+        self.seq = next(Event._seq)
 
     def __lt__(self, other):
-        return self.time < other.time
+        return (self.time, self.seq) < (other.time, other.seq)
 
 
 class SimulationEngine:
@@ -25,15 +31,31 @@ class SimulationEngine:
     Events: 'order_arrival', 'pickup', 'delivery', 'rider_return'
     """
 
-    def __init__(self, start_minute=0, end_minute=60 * 24):
+    def __init__(self, start_minute=0, end_minute=60 * 24, strategy='auto'):
         self.time = start_minute
         self.end_minute = end_minute
         self.riders: List[Rider] = []
         self.orders: List[Order] = []
         self.planner = PathPlanner()
-        self.scheduler = Scheduler(self.riders, self.planner)
+        self.scheduler = Scheduler(self.riders, self.planner, strategy=strategy)
         self.metrics = Metrics()
         self.event_queue: List[Event] = []
+        # arrived orders still waiting for a rider; avoids rescanning self.orders on every arrival.
+        # Kept in add_order order (by arrival event seq) so the scheduler sees the same
+        # sequence a scan of self.orders would give.
+        self._open_orders: List[Order] = []
+        self._open_seqs: List[int] = []
+        # lazily consumed orders (see add_order_stream)
+        self._order_stream = None
+        self._next_streamed: Any = None
+        self._last_streamed_time = None
+        # callables invoked as hook(order) when an order is COMPLETED
+        self.completion_hooks: List[Callable] = []
+        # when False, completed orders are periodically dropped from self.orders
+        self.retain_completed_orders = True
+        self._completed_since_compaction = 0
+        # callables invoked as hook(time, rider, orders) for every batch assignment
+        self.assignment_hooks: List[Callable] = []
 
     def schedule_event(self, event: Event):
         heapq.heappush(self.event_queue, event)
@@ -49,10 +71,12 @@ class SimulationEngine:
     def handle_rider_online(self, rider: Rider):
         rider.go_online()
         logger.info("Rider %s ONLINE at %s", rider.id, self.time)
+        self.metrics.record_rider_event(rider, self.time, 'online')
 
     def handle_rider_offline(self, rider: Rider):
         rider.go_offline()
         logger.info("Rider %s OFFLINE at %s", rider.id, self.time)
+        self.metrics.record_rider_event(rider, self.time, 'offline')
 
     def add_order(self, order: Order):
         self.orders.append(order)
@@ -61,15 +85,47 @@ class SimulationEngine:
         ev = Event(order.request_time, 'order_arrival', order)
         self.schedule_event(ev)
 
-    def handle_order_arrival(self, order: Order):
+    def add_order_stream(self, orders: Iterable[Order]):
+        """Register orders to be added lazily as the clock reaches their request_time.
+
+        `orders` must be sorted by request_time; it is only advanced as far as
+        the simulation has progressed, so generators over large files are never
+        materialized up front. Several streams are merged. An order earlier
+        than the previous streamed order or the current clock raises ValueError.
+        """
+        stream = iter(orders)
+        if self._next_streamed is not None:
+            # the held head is never later than the rest of its stream
+            current = itertools.chain([self._next_streamed], self._order_stream)
+            stream = heapq.merge(current, stream, key=lambda o: o.request_time)
+        self._order_stream = stream
+        self._next_streamed = next(self._order_stream, None)
+
+    def _feed_orders(self, until):
+        while self._next_streamed is not None and self._next_streamed.request_time <= until:
+            order = self._next_streamed
+            floor = max(self.time, self._last_streamed_time if self._last_streamed_time is not None else self.time)
+            if order.request_time < floor:
+                raise ValueError("Order stream not sorted by request_time: order %s at %s after minute %s"
+                                 % (order.id, order.request_time, floor))
+            self._last_streamed_time = order.request_time
+            self.add_order(order)
+            self._next_streamed = next(self._order_stream, None)
+
+    def handle_order_arrival(self, order: Order, seq: Optional[int] = None):
         # mark arrival
         order.status = OrderStatus.ARRIVED
         logger.info("Order %s ARRIVED at %s", order.id, self.time)
+        if seq is None:
+            seq = next(Event._seq)
+        pos = bisect.bisect_right(self._open_seqs, seq)
+        self._open_seqs.insert(pos, seq)
+        self._open_orders.insert(pos, order)
         # When any order arrives, try dispatching all pending unassigned orders (allow batching)
-        for o in self.orders:
+        for o in self._open_orders:
             if o.request_time <= self.time and o.status == OrderStatus.ARRIVED:
                 o.status = OrderStatus.PENDING
-        pending = [o for o in self.orders if o.status == OrderStatus.PENDING and o.request_time <= self.time]
+        pending = [o for o in self._open_orders if o.status == OrderStatus.PENDING and o.request_time <= self.time]
         logger.debug("Order arrival handling at time=%s pending_count=%s", self.time, len(pending))
         # batch assignment: scheduler returns list of (rider, [orders])
         assignments = self.scheduler.dispatch(pending, current_time=self.time)
@@ -82,6 +138,9 @@ class SimulationEngine:
                 o.status = OrderStatus.ASSIGNED
                 o.assigned_rider = rider.id
                 logger.info("Order %s status->ASSIGNED rider=%s at %s", o.id, rider.id, self.time)
+            self.metrics.record_rider_event(rider, self.time, 'assigned', order_batch)
+            for hook in self.assignment_hooks:
+                hook(self.time, rider, order_batch)
             if rider.busy_since is None:
                 rider.busy_since = self.time
             # build route: depot -> dropoff1 -> dropoff2 ...
@@ -102,6 +161,9 @@ class SimulationEngine:
                 'delivery_times': delivery_times,
                 'route': route
             }))
+        still_open = [i for i, o in enumerate(self._open_orders) if o.status in (OrderStatus.ARRIVED, OrderStatus.PENDING)]
+        self._open_orders = [self._open_orders[i] for i in still_open]
+        self._open_seqs = [self._open_seqs[i] for i in still_open]
 
     def handle_delivery_batch(self, data: dict):
         rider = data['rider']
@@ -130,6 +192,7 @@ class SimulationEngine:
         rider.assigned_orders.clear()
         rider.location = getattr(rider, 'base_location', rider.location)
         logger.info("Rider %s returned to base at %s and is now IDLE", rider.id, self.time)
+        self.metrics.record_rider_event(rider, self.time, 'returned')
         # mark busy period end for utilization
         if rider.busy_since is not None:
             busy = self.time - rider.busy_since
@@ -142,24 +205,55 @@ class SimulationEngine:
             for o in orders:
                 o.status = OrderStatus.COMPLETED
                 logger.info("Order %s status->COMPLETED at %s", o.id, self.time)
+                for hook in self.completion_hooks:
+                    hook(o)
+            if not self.retain_completed_orders:
+                self._completed_since_compaction += len(orders)
+                # compact once a good share of the list is completed: amortized O(1) per order
+                if self._completed_since_compaction >= max(1000, len(self.orders) // 2):
+                    self.orders = [o for o in self.orders if o.status != OrderStatus.COMPLETED]
+                    self._completed_since_compaction = 0
+
+    def dispatch_event(self, ev: Event):
+        if ev.kind == 'order_arrival':
+            self.handle_order_arrival(ev.payload, ev.seq)
+        elif ev.kind == 'delivery_batch':
+            self.handle_delivery_batch(ev.payload)
+        elif ev.kind == 'rider_return':
+            self.handle_rider_return(ev.payload)
+        elif ev.kind == 'rider_online':
+            self.handle_rider_online(ev.payload)
+        elif ev.kind == 'rider_offline':
+            self.handle_rider_offline(ev.payload)
+
+    def next_event_time(self):
+        """Time of the earliest queued event or streamed order, or None when there is none."""
+        times = []
+        if self.event_queue:
+            times.append(self.event_queue[0].time)
+        if self._next_streamed is not None:
+            times.append(self._next_streamed.request_time)
+        return min(times) if times else None
+
+    def step(self, until) -> bool:
+        """Process the next event if it is due at or before `until`.
+
+        Returns False (leaving the queue untouched) when no such event exists.
+        """
+        if self._next_streamed is not None:
+            horizon = self.event_queue[0].time if self.event_queue else until
+            self._feed_orders(min(horizon, until))
+        if not self.event_queue or self.event_queue[0].time > until:
+            return False
+        ev = heapq.heappop(self.event_queue)
+        # advance time
+        self.time = ev.time
+        self.dispatch_event(ev)
+        return True
 
     def run(self, until=None):
         if until is None:
             until = self.end_minute
-        while self.event_queue and self.time <= until:
-            ev = heapq.heappop(self.event_queue)
-            # advance time
-            self.time = ev.time
-            if self.time > until:
-                break
-            if ev.kind == 'order_arrival':
-                self.handle_order_arrival(ev.payload)
-            elif ev.kind == 'delivery_batch':
-                self.handle_delivery_batch(ev.payload)
-            elif ev.kind == 'rider_return':
-                self.handle_rider_return(ev.payload)
-            elif ev.kind == 'rider_online':
-                self.handle_rider_online(ev.payload)
-            elif ev.kind == 'rider_offline':
-                self.handle_rider_offline(ev.payload)
+        while self.step(until):
+            pass
         return self.metrics
@@ -0,0 +1,208 @@
+"""Columnar export of simulation results.
+
+Rows are buffered into per-column lists and written in batches of
+`batch_size`: one Parquet row group per batch (requires pyarrow), or one
+bulk `writerows` call per batch for CSV.
+"""
+import csv
+import os
+from typing import Dict, Iterable, List, Optional
+
+from .models import Order, OrderStatus
+from .scenario import detect_format
+
+# (column name, type) for each exported table; types map to Parquet types
+ORDER_COLUMNS = [
+    ('order_id', 'string'),
+    ('order_type', 'string'),
+    ('status', 'string'),
+    ('request_time', 'int'),
+    ('window_start', 'int'),
+    ('window_end', 'int'),
+    ('assigned_rider', 'string'),
+    ('assigned_time', 'int'),
+    ('est_delivery_time', 'int'),
+    ('delivery_time', 'int'),
+    ('on_time', 'bool'),
+    ('dropoff_x', 'float'),
+    ('dropoff_y', 'float'),
+]
+
+RIDER_TIMELINE_COLUMNS = [
+    ('rider_id', 'string'),
+    ('time', 'int'),
+    ('event', 'string'),
+    ('order_ids', 'string'),
+]
+
+DEFAULT_BATCH_SIZE = 50000
+
+
+class ColumnarWriter:
+    """Write rows to Parquet or CSV in column batches.
+
+    Use as a context manager, or call close() to flush the last batch.
+    Closing again is a no-op.
+    """
+
+    def __init__(self, path: str, columns: List[tuple], fmt: Optional[str] = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE):
+        self.path = path
+        self.columns = columns
+        self.fmt = detect_format(path, fmt)
+        if self.fmt not in ('parquet', 'csv'):
+            raise ValueError("Unsupported export format %r" % self.fmt)
+        self.batch_size = batch_size
+        self.rows_written = 0
+        self._buffer: Dict[str, list] = {name: [] for name, _ in columns}
+        self._buffered = 0
+        self._writer = None
+        self._fh = None
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write_row(self, row: dict):
+        for name, _ in self.columns:
+            self._buffer[name].append(row.get(name))
+        self._buffered += 1
+        if self._buffered >= self.batch_size:
+            self.flush()
+
+    def write_rows(self, rows: Iterable[dict]):
+        for row in rows:
+            self.write_row(row)
+
+    def flush(self):
+        if self._buffered == 0:
+            return
+        if self.fmt == 'parquet':
+            self._flush_parquet()
+        else:
+            self._flush_csv()
+        self.rows_written += self._buffered
+        self._buffer = {name: [] for name, _ in self.columns}
+        self._buffered = 0
+
+    def _flush_parquet(self):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet export requires pyarrow (pip install pyarrow)") from e
+        types = {'string': pa.string(), 'int': pa.int64(), 'float': pa.float64(), 'bool': pa.bool_()}
+        schema = pa.schema([(name, types[kind]) for name, kind in self.columns])
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, schema)
+        self._writer.write_table(pa.Table.from_pydict(self._buffer, schema=schema))
+
+    def _flush_csv(self):
+        if self._fh is None:
+            self._fh = open(self.path, 'w', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._fh)
+            self._writer.writerow([name for name, _ in self.columns])
+        names = [name for name, _ in self.columns]
+        self._writer.writerows(zip(*(self._buffer[name] for name in names)))
+
+    def close(self):
+        if self._closed:
+            return
+        self.flush()
+        if self.fmt == 'parquet':
+            if self._writer is None:
+                # no rows at all: still produce a readable file with the schema
+                self._flush_parquet()
+            self._writer.close()
+        else:
+            if self._fh is None:
+                self._flush_csv()
+            self._fh.close()
+        self._writer = None
+        self._fh = None
+        self._closed = True
+
+
+def order_row(order: Order) -> dict:
+    on_time = None
+    if order.delivery_time is not None and order.window_end is not None:
+        on_time = order.delivery_time <= order.window_end
+    return {
+        'order_id': order.id,
+        'order_type': order.order_type,
+        'status': order.status.value,
+        'request_time': order.request_time,
+        'window_start': order.window_start,
+        'window_end': order.window_end,
+        'assigned_rider': order.assigned_rider,
+        'assigned_time': order.assigned_time,
+        'est_delivery_time': order.est_delivery_time,
+        'delivery_time': order.delivery_time,
+        'on_time': on_time,
+        'dropoff_x': order.dropoff[0],
+        'dropoff_y': order.dropoff[1],
+    }
+
+
+def export_orders(orders: Iterable[Order], path: str, fmt: Optional[str] = None,
+                  batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Write one row per order outcome; returns the number of rows written."""
+    with ColumnarWriter(path, ORDER_COLUMNS, fmt, batch_size) as writer:
+        writer.write_rows(order_row(o) for o in orders)
+    return writer.rows_written
+
+
+def export_rider_timeline(timeline: Iterable[dict], path: str, fmt: Optional[str] = None,
+                          batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Write `Metrics.rider_timeline` entries; order ids are joined with ';'."""
+    with ColumnarWriter(path, RIDER_TIMELINE_COLUMNS, fmt, batch_size) as writer:
+        writer.write_rows(dict(e, order_ids=';'.join(e['order_ids'])) for e in timeline)
+    return writer.rows_written
+
+
+class OrderOutcomeExporter:
+    """Write order outcomes while the engine runs instead of after it.
+
+    Each order is written as soon as it is COMPLETED. With
+    `release_completed=True` the engine then drops completed orders from
+    `engine.orders`, so long replays keep only in-flight orders in memory.
+    `close()` writes the orders that never completed and returns the row count.
+    """
+
+    def __init__(self, engine, path: str, fmt: Optional[str] = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE, release_completed: bool = True):
+        self.engine = engine
+        self.writer = ColumnarWriter(path, ORDER_COLUMNS, fmt, batch_size)
+        engine.completion_hooks.append(self._on_completed)
+        if release_completed:
+            engine.retain_completed_orders = False
+
+    def _on_completed(self, order: Order):
+        self.writer.write_row(order_row(order))
+
+    def close(self) -> int:
+        self.engine.completion_hooks.remove(self._on_completed)
+        self.writer.write_rows(order_row(o) for o in self.engine.orders if o.status != OrderStatus.COMPLETED)
+        self.writer.close()
+        return self.writer.rows_written
+
+
+def export_results(engine, out_dir: str, fmt: str = 'parquet', batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, str]:
+    """Export per-order outcomes and per-rider timelines of a finished run.
+
+    Orders are taken from `engine.orders`, so every order must still be in
+    memory; use OrderOutcomeExporter during the run for long replays.
+
+    Returns the paths written, keyed by table name.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {
+        'orders': os.path.join(out_dir, 'orders.' + fmt),
+        'rider_timeline': os.path.join(out_dir, 'rider_timeline.' + fmt),
+    }
+    export_orders(engine.orders, paths['orders'], fmt, batch_size)
+    export_rider_timeline(engine.metrics.rider_timeline, paths['rider_timeline'], fmt, batch_size)
+    return paths
@@ -8,6 +8,7 @@ class Metrics:
         self.total_distance_km = 0.0
         self.count_distance = 0
         self.rider_busy_time = {}  # rider_id -> busy minutes total
+        self.rider_timeline = []  # per-rider state changes, in event order
 
     def record_delivery(self, order, time_minute, distance_km: float = None):
         self.deliveries.append({'order_id': order.id, 'time': time_minute, 'window_end': getattr(order, 'window_end', None)})
@@ -51,3 +52,11 @@ class Metrics:
             return
         busy = time_minute - rider.busy_since
         self.rider_busy_time[rider.id] = self.rider_busy_time.get(rider.id, 0) + busy
+
+    def record_rider_event(self, rider, time_minute, event: str, orders=None):
+        self.rider_timeline.append({
+            'rider_id': rider.id,
+            'time': time_minute,
+            'event': event,
+            'order_ids': [o.id for o in orders] if orders else [],
+        })
@@ -4,6 +4,41 @@ from typing import Optional
 import uuid
 
 
+def _point(data: dict, name: str, default: Optional[tuple] = None) -> tuple:
+    """Read a coordinate stored either as `name` = [x, y] or as `name_x`/`name_y` columns.
+
+    Returns `default` when neither form is present; without a default the
+    point is required and ValueError is raised. Only one of `name_x`/`name_y`,
+    or a `name` that is not an [x, y] pair (e.g. a string), also raises.
+    """
+    value = data.get(name)
+    if value is not None:
+        if not isinstance(value, (list, tuple)) or len(value) != 2:
+            raise ValueError("%s must be an [x, y] pair, got %r" % (name, value))
+        return (float(value[0]), float(value[1]))
+    x, y = data.get(name + '_x'), data.get(name + '_y')
+    x = None if x == "" else x
+    y = None if y == "" else y
+    if x is None and y is None:
+        if default is None:
+            raise ValueError("Missing %s: expected %s or %s_x/%s_y" % (name, name, name, name))
+        return default
+    if x is None or y is None:
+        raise ValueError("%s needs both %s_x and %s_y" % (name, name, name))
+    return (float(x), float(y))
+
+
+def _optional_int(value) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    return int(float(value))
+
+
+def _int(value, default: int) -> int:
+    value = _optional_int(value)
+    return default if value is None else value
+
+
 class RiderState(Enum):
     OFFLINE = "offline"
     ONLINE = "online"
@@ -48,6 +83,20 @@ class Rider:
         self.online = False
         self.state = RiderState.OFFLINE
 
+    @classmethod
+    def from_dict(cls, data: dict) -> "Rider":
+        """Build a rider from a plain record (e.g. one decoded JSON line)."""
+        location = _point(data, 'location', (0.0, 0.0))
+        rider = cls(
+            star=_int(data.get('star'), 3),
+            location=location,
+            base_location=_point(data, 'base_location', location),
+            capacity=_int(data.get('capacity'), 3),
+        )
+        if data.get('id') not in (None, ""):
+            rider.id = str(data['id'])
+        return rider
+
 
 @dataclass
 class Order:
@@ -66,3 +115,19 @@ class Order:
     pickup_duration: int = 1  # minutes spent at pickup (dwell)
     est_pickup_time: Optional[int] = None
     est_delivery_time: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Order":
+        """Build an order from a plain record (e.g. one decoded JSON line)."""
+        order = cls(
+            pickup=_point(data, 'pickup', (0.0, 0.0)),
+            dropoff=_point(data, 'dropoff'),
+            request_time=_int(data.get('request_time'), 0),
+            window_start=_optional_int(data.get('window_start')),
+            window_end=_optional_int(data.get('window_end')),
+            order_type=data.get('order_type') or "immediate",
+            pickup_duration=_int(data.get('pickup_duration'), 1),
+        )
+        if data.get('id') not in (None, ""):
+            order.id = str(data['id'])
+        return order
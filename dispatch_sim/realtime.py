@@ -0,0 +1,372 @@
+"""Real-time (shadow mode) driver for SimulationEngine.
+
+`SimulationEngine.run` drains a pre-filled event heap as fast as possible.
+`RealtimeRunner` instead paces the engine against the wall clock and feeds it
+orders and rider status changes from a live source while it runs, so the
+dispatcher can shadow a production system and its assignment decisions can be
+compared with the production ones.
+
+Sources are async iterables of plain dict records, one per event:
+
+    {"type": "rider", "id": "r1", "location": [0, 0], "capacity": 3, "online": true}
+    {"type": "rider_online", "rider_id": "r1"}
+    {"type": "rider_offline", "rider_id": "r1"}
+    {"type": "order", "id": "o1", "dropoff": [1.0, 2.0], "window_end": 25}
+
+An optional "time" field (simulation minute) delays a record until the clock
+reaches it, which allows paced replay of a recorded stream; records without
+it (or already in the past) take effect at the current minute.
+"""
+import asyncio
+import json
+import logging
+import math
+import time
+from typing import Optional
+
+from .engine import SimulationEngine, Event
+from .models import Rider, Order
+
+logger = logging.getLogger(__name__)
+
+# marks the end of the source stream in the runner's inbox
+_EOF = object()
+
+# errors raised by a record with missing or malformed fields; such records are
+# logged and skipped like undecodable lines, so one bad record cannot end the run
+_RECORD_ERRORS = (ValueError, TypeError, IndexError, KeyError)
+
+
+def _decode_line(line):
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        return json.loads(line)
+    except ValueError:
+        logger.warning("Skipping malformed record: %r", line[:200])
+        return None
+
+
+class JsonlTailSource:
+    """Records from a JSONL file.
+
+    With follow=True the file is tailed like `tail -f`: at EOF it is polled
+    every `poll_interval` seconds for appended lines and iteration never ends
+    on its own. Otherwise iteration stops at EOF.
+    """
+
+    def __init__(self, path: str, follow: bool = False, poll_interval: float = 0.1):
+        self.path = path
+        self.follow = follow
+        self.poll_interval = poll_interval
+
+    def __aiter__(self):
+        return self._records()
+
+    async def _records(self):
+        with open(self.path, 'r', encoding='utf-8') as fh:
+            partial = ''
+            while True:
+                line = fh.readline()
+                if not line:
+                    if not self.follow:
+                        break
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                partial += line
+                if self.follow and not partial.endswith('\n'):
+                    # writer is mid-line; wait for the rest of it
+                    continue
+                record = _decode_line(partial)
+                partial = ''
+                if record is not None:
+                    yield record
+            record = _decode_line(partial)
+            if record is not None:
+                yield record
+
+
+class StreamSource:
+    """Records from newline-delimited JSON on an asyncio.StreamReader.
+
+    If the connection's `writer` is given it is kept alive for the lifetime
+    of the stream and closed at EOF.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: Optional[asyncio.StreamWriter] = None):
+        self.reader = reader
+        self.writer = writer
+
+    def __aiter__(self):
+        return self._records()
+
+    async def _records(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                if self.writer is not None:
+                    self.writer.close()
+                break
+            record = _decode_line(line.decode('utf-8'))
+            if record is not None:
+                yield record
+
+
+async def open_unix_source(path: str) -> StreamSource:
+    """Connect to a Unix socket that streams JSONL records."""
+    reader, writer = await asyncio.open_unix_connection(path)
+    return StreamSource(reader, writer)
+
+
+class QueueSource:
+    """Records pushed onto an asyncio.Queue; a `None` item ends the stream."""
+
+    def __init__(self, queue: asyncio.Queue):
+        self.queue = queue
+
+    def __aiter__(self):
+        return self._records()
+
+    async def _records(self):
+        while True:
+            record = await self.queue.get()
+            if record is None:
+                break
+            yield record
+
+
+class RealtimeRunner:
+    """Drive a SimulationEngine from a live record source in wall-clock time.
+
+    One simulated minute takes `60 / speedup` wall seconds. Decisions are put
+    on the bounded `decisions` queue as dicts
+    ``{'time', 'rider_id', 'order_ids', 'est_delivery_times'}``; when the run
+    ends, normally or with an error, a final `None` is added if there is room.
+    `iter_decisions()` wraps that as an async iterator and always terminates.
+
+    Backpressure: at most `max_buffered` records are read ahead of the
+    simulation clock, after which the source is not read any further; when
+    the `decisions` queue is full the engine waits for the consumer and
+    catches up with the wall clock afterwards.
+
+    A consumer is therefore required: without one, `run()` blocks for good
+    after `decision_buffer` decisions. For a metrics-only shadow run pass
+    `emit_decisions=False`; no decisions are queued and `iter_decisions()`
+    ends as soon as the run does.
+    """
+
+    def __init__(self, engine: SimulationEngine, source, speedup: float = 1.0,
+                 max_buffered: int = 1000, decision_buffer: int = 1000,
+                 emit_decisions: bool = True, clock=time.monotonic):
+        if speedup <= 0:
+            raise ValueError("speedup must be positive")
+        self.engine = engine
+        self.source = source
+        self.speedup = speedup
+        self.max_buffered = max_buffered
+        self.decision_buffer = decision_buffer
+        self.emit_decisions = emit_decisions
+        self.clock = clock
+        # queues are created inside the running event loop (see _ensure_queues)
+        self.decisions: Optional[asyncio.Queue] = None
+        self._inbox: Optional[asyncio.Queue] = None
+        self._held = None
+        self._source_done = False
+        self._closed = False
+        # pending inbox.get(), kept across waits so a completed get is never discarded
+        self._get_task: Optional[asyncio.Future] = None
+        self._pending_decisions = []
+        self._start_wall = None
+        self._start_minute = engine.time
+
+    def _ensure_queues(self):
+        if self.decisions is None:
+            self.decisions = asyncio.Queue(maxsize=self.decision_buffer)
+        if self._inbox is None:
+            self._inbox = asyncio.Queue(maxsize=self.max_buffered)
+
+    def sim_now(self) -> float:
+        """Current simulation minute according to the wall clock."""
+        if self._start_wall is None:
+            return float(self._start_minute)
+        return self._start_minute + (self.clock() - self._start_wall) * self.speedup / 60.0
+
+    async def iter_decisions(self):
+        self._ensure_queues()
+        while True:
+            if self._closed and self.decisions.empty():
+                break
+            decision = await self.decisions.get()
+            if decision is None:
+                break
+            yield decision
+
+    async def run(self, until=None):
+        """Run until simulation minute `until` (default: engine.end_minute),
+        or until the source is exhausted and no events remain."""
+        self._ensure_queues()
+        if until is None:
+            until = self.engine.end_minute
+        self._start_minute = self.engine.time
+        self._start_wall = self.clock()
+        if self.emit_decisions:
+            self.engine.assignment_hooks.append(self._on_assignment)
+        ingest = asyncio.ensure_future(self._ingest())
+        try:
+            while True:
+                now = min(self.sim_now(), until)
+                self._admit(now)
+                while self.engine.step(now):
+                    await self._flush_decisions()
+                if now >= until:
+                    break
+                if self._source_done and self._held is None and self.engine.next_event_time() is None:
+                    break
+                await self._wait(now, until)
+        finally:
+            ingest.cancel()
+            if self._get_task is not None:
+                self._get_task.cancel()
+                self._get_task = None
+            if self.emit_decisions:
+                self.engine.assignment_hooks.remove(self._on_assignment)
+            self._closed = True
+            try:
+                self.decisions.put_nowait(None)
+            except asyncio.QueueFull:
+                # consumers stop on _closed once they have drained the queue
+                pass
+        logger.info("Realtime run finished at minute %s", self.engine.time)
+        return self.engine.metrics
+
+    async def _ingest(self):
+        try:
+            async for record in self.source:
+                await self._inbox.put(record)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Realtime source failed; treating it as end of stream")
+        await self._inbox.put(_EOF)
+
+    def _take(self, record):
+        if record is _EOF:
+            self._source_done = True
+            return
+        if not isinstance(record, dict):
+            logger.warning("Skipping record that is not an object: %r", record)
+            return
+        try:
+            self._release_time(record)
+        except _RECORD_ERRORS as e:
+            logger.warning("Skipping record with bad time %r: %s", record, e)
+            return
+        self._held = record
+
+    def _release_time(self, record) -> Optional[int]:
+        t = record.get('time')
+        return None if t is None else int(t)
+
+    def _admit(self, now: float):
+        """Apply buffered records that are due at or before `now`."""
+        while True:
+            if self._held is None:
+                if self._source_done:
+                    return
+                if self._get_task is not None:
+                    if not self._get_task.done():
+                        return
+                    task, self._get_task = self._get_task, None
+                    self._take(task.result())
+                    continue
+                try:
+                    self._take(self._inbox.get_nowait())
+                except asyncio.QueueEmpty:
+                    return
+                continue
+            release = self._release_time(self._held)
+            if release is not None and release > now:
+                return
+            record, self._held = self._held, None
+            self._apply(record, max(release or 0, int(math.floor(now))))
+
+    def _find_rider(self, rider_id) -> Optional[Rider]:
+        rider_id = str(rider_id)
+        for r in self.engine.riders:
+            if r.id == rider_id:
+                return r
+        return None
+
+    def _apply(self, record: dict, at: int):
+        kind = record.get('type')
+        if kind == 'order':
+            try:
+                order = Order.from_dict(record)
+            except _RECORD_ERRORS as e:
+                logger.warning("Skipping malformed order record %r: %s", record, e)
+                return
+            order.request_time = at
+            self.engine.add_order(order)
+        elif kind == 'rider':
+            try:
+                rider = Rider.from_dict(record)
+            except _RECORD_ERRORS as e:
+                logger.warning("Skipping malformed rider record %r: %s", record, e)
+                return
+            if self._find_rider(rider.id) is not None:
+                logger.warning("Rider %s already registered; ignoring record", rider.id)
+                return
+            self.engine.add_rider(rider)
+            if record.get('online'):
+                self.engine.schedule_event(Event(at, 'rider_online', rider))
+        elif kind in ('rider_online', 'rider_offline'):
+            rider = self._find_rider(record.get('rider_id'))
+            if rider is None:
+                logger.warning("Unknown rider %s in %s record", record.get('rider_id'), kind)
+                return
+            self.engine.schedule_event(Event(at, kind, rider))
+        else:
+            logger.warning("Unknown record type %r", kind)
+
+    def _on_assignment(self, time_minute, rider, orders):
+        self._pending_decisions.append({
+            'time': time_minute,
+            'rider_id': rider.id,
+            'order_ids': [o.id for o in orders],
+            'est_delivery_times': [o.est_delivery_time for o in orders],
+        })
+
+    async def _flush_decisions(self):
+        for decision in self._pending_decisions:
+            if self.decisions.full():
+                logger.warning("Decision consumer is lagging; pausing simulation at minute %s", self.engine.time)
+            await self.decisions.put(decision)
+        self._pending_decisions = []
+
+    async def _wait(self, now: float, until):
+        """Sleep until the next event or record is due, waking early for new input."""
+        target = until
+        next_event = self.engine.next_event_time()
+        if next_event is not None:
+            target = min(target, next_event)
+        if self._held is not None:
+            release = self._release_time(self._held)
+            target = min(target, release if release is not None else now)
+        timeout = max(0.0, (target - self.sim_now()) * 60.0 / self.speedup)
+        if self._held is None and not self._source_done:
+            # asyncio.wait (unlike wait_for) never cancels the get, so an item
+            # that arrives at the timeout is picked up by the next _admit
+            if self._get_task is None:
+                self._get_task = asyncio.ensure_future(self._inbox.get())
+            await asyncio.wait({self._get_task}, timeout=timeout)
+        else:
+            await asyncio.sleep(timeout)
+
+
+async def write_decisions_jsonl(runner: RealtimeRunner, path: str):
+    """Append every decision emitted by `runner` to a JSONL file."""
+    with open(path, 'a', encoding='utf-8') as fh:
+        async for decision in runner.iter_decisions():
+            fh.write(json.dumps(decision) + '\n')
+            fh.flush()
@@ -0,0 +1,336 @@
+"""Paired replications with common random numbers and CI-based early stopping.
+
+A scenario is a function ``scenario(seed, **config) -> SimulationEngine``
+that builds a fully populated engine. `ReplicationController` runs the
+baseline and candidate configurations on the same seed in every replication,
+so both see identical order and rider streams (common random numbers) and
+the KPI differences are paired. After each replication it computes a
+Student-t confidence interval on the mean difference of every KPI, and stops
+once each KPI is resolved or the replication budget is spent. A KPI is
+resolved when its interval excludes zero (the configurations differ) or lies
+entirely within +/- the KPI's tolerance (any difference is too small to
+matter).
+
+Because the intervals are re-checked at several looks, the error rate
+1 - confidence is spent across them with a Lan-DeMets alpha-spending function
+of the information fraction n / max_replications (Pocock-type by default,
+O'Brien-Fleming-type on request). Each look uses its increment of the
+spending function as its own error rate, so the chance of ever declaring a
+difference that is not there stays below 1 - confidence per KPI. Only the
+looks that will actually happen (every `look_every` replications from
+`min_replications`, plus the last) are counted, and Pocock spending puts
+most of the error rate on the early looks, so large differences still stop
+after a few replications.
+
+Scenarios should draw randomness from `random_stream(seed, name)`, one
+stream per source of randomness, so a configuration change that consumes
+more numbers from one stream does not shift the others.
+"""
+import logging
+import math
+import random
+from dataclasses import dataclass, field
+from statistics import NormalDist, mean, stdev
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+
+def random_stream(seed, name: str) -> random.Random:
+    """Independent, reproducible random stream `name` for replication `seed`."""
+    return random.Random("%s:%s" % (seed, name))
+
+
+def fleet_utilization(sim, sim_time: int) -> float:
+    """Busy fraction of the whole fleet over `sim_time` minutes.
+
+    Busy periods still open at `sim_time` (riders out on a delivery or on
+    their way back) count up to `sim_time`.
+    """
+    if not sim.riders or not sim_time:
+        return 0.0
+    busy = sum(sim.metrics.rider_busy_time.values())
+    busy += sum(max(0, sim_time - r.busy_since) for r in sim.riders if r.busy_since is not None)
+    return busy / (len(sim.riders) * sim_time)
+
+
+# KPI name -> function(sim, sim_time) -> float
+KPIS: Dict[str, Callable] = {
+    'on_time_rate': lambda sim, sim_time: sim.metrics.summary(sim_time)['on_time_rate'],
+    'avg_delivery_time_min': lambda sim, sim_time: sim.metrics.summary(sim_time)['avg_delivery_time_min'],
+    'utilization': fleet_utilization,
+}
+
+# smallest difference worth distinguishing, per KPI
+DEFAULT_TOLERANCES = {
+    'on_time_rate': 0.01,
+    'avg_delivery_time_min': 0.5,
+    'utilization': 0.01,
+}
+
+
+def _betacf(a: float, b: float, x: float) -> float:
+    # continued fraction for the incomplete beta function (modified Lentz)
+    tiny = 1e-300
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c = 1.0
+    d = 1.0 - qab * x / qap
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 300):
+        m2 = 2 * m
+        for aa in (m * (b - m) * x / ((qam + m2) * (a + m2)),
+                   -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))):
+            d = 1.0 + aa * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + aa / c
+            c = c if abs(c) > tiny else tiny
+            h *= d * c
+        if abs(d * c - 1.0) < 1e-15:
+            break
+    return h
+
+
+def _betainc(a: float, b: float, x: float) -> float:
+    """Regularized incomplete beta function I_x(a, b)."""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log(1.0 - x))
+    if x < (a + 1.0) / (a + b + 2.0):
+        return front * _betacf(a, b, x) / a
+    return 1.0 - front * _betacf(b, a, 1.0 - x) / b
+
+
+def t_cdf(t: float, df: int) -> float:
+    tail = t_tail(abs(t), df)
+    return 1.0 - tail if t > 0 else tail
+
+
+def t_tail(t: float, df: int) -> float:
+    """Upper-tail probability P(T > t) for t >= 0."""
+    return 0.5 * _betainc(df / 2.0, 0.5, df / (df + t * t))
+
+
+def t_critical(tail: float, df: int) -> float:
+    """Value t with P(T > t) = `tail`, by bisection on the exact tail.
+
+    Works on the tail directly so levels far below float precision near 1
+    (as used by early looks) keep their accuracy; returns inf when `tail`
+    is 0.
+    """
+    if not 0 <= tail <= 0.5:
+        raise ValueError("tail must be in [0, 0.5]")
+    if tail == 0:
+        return math.inf
+    if tail == 0.5:
+        return 0.0
+    lo, hi = 0.0, 1.0
+    while t_tail(hi, df) > tail:
+        lo, hi = hi, hi * 2
+    while hi - lo > 1e-10 * hi:
+        mid = (lo + hi) / 2
+        if t_tail(mid, df) > tail:
+            lo = mid
+        else:
+            hi = mid
+    return (lo + hi) / 2
+
+
+def t_quantile(p: float, df: int) -> float:
+    """Student-t quantile, by bisection on the exact CDF (any df >= 1)."""
+    if not 0 < p < 1:
+        raise ValueError("p must be in (0, 1)")
+    if p < 0.5:
+        return -t_quantile(1 - p, df)
+    return t_critical(1 - p, df)
+
+
+def pocock_spending(alpha: float, fraction: float) -> float:
+    """Lan-DeMets Pocock-type spending: alpha * ln(1 + (e - 1) * fraction)."""
+    return alpha * math.log(1 + (math.e - 1) * fraction)
+
+
+def obrien_fleming_spending(alpha: float, fraction: float) -> float:
+    """Lan-DeMets O'Brien-Fleming-type spending: 2 - 2 * Phi(z_{1 - alpha/2} / sqrt(fraction))."""
+    z = NormalDist().inv_cdf(1 - alpha / 2)
+    return 2 * (1 - NormalDist().cdf(z / math.sqrt(fraction)))
+
+
+SPENDING_FUNCTIONS: Dict[str, Callable] = {
+    'pocock': pocock_spending,
+    'obrien-fleming': obrien_fleming_spending,
+}
+
+
+@dataclass
+class KpiComparison:
+    name: str
+    baseline_mean: float
+    candidate_mean: float
+    mean_diff: float  # candidate - baseline
+    ci_low: float
+    ci_high: float
+    tolerance: float
+
+    @property
+    def half_width(self) -> float:
+        return (self.ci_high - self.ci_low) / 2
+
+    @property
+    def significant(self) -> bool:
+        """The interval excludes zero: the configurations differ on this KPI."""
+        return self.ci_low > 0 or self.ci_high < 0
+
+    @property
+    def equivalent(self) -> bool:
+        """The interval lies within +/- tolerance: any difference is too small to matter."""
+        return -self.tolerance <= self.ci_low and self.ci_high <= self.tolerance
+
+    @property
+    def resolved(self) -> bool:
+        return self.significant or self.equivalent
+
+
+@dataclass
+class ReplicationResult:
+    replications: int
+    stop_reason: str  # 'resolved' or 'budget'
+    comparisons: Dict[str, KpiComparison]
+    baseline_samples: List[Dict[str, float]] = field(default_factory=list)
+    candidate_samples: List[Dict[str, float]] = field(default_factory=list)
+
+    def summary(self) -> dict:
+        return {
+            'replications': self.replications,
+            'stop_reason': self.stop_reason,
+            'kpis': {
+                name: {
+                    'baseline_mean': c.baseline_mean,
+                    'candidate_mean': c.candidate_mean,
+                    'mean_diff': c.mean_diff,
+                    'ci': (c.ci_low, c.ci_high),
+                    'significant': c.significant,
+                    'equivalent': c.equivalent,
+                    'resolved': c.resolved,
+                }
+                for name, c in self.comparisons.items()
+            },
+        }
+
+
+class ReplicationController:
+    """Compare two configurations of a scenario with paired replications.
+
+    `baseline` and `candidate` are keyword-argument dicts passed to
+    `scenario(seed, **config)`. Replication i uses seed `base_seed + i` for
+    both. `kpis` is a sequence of names from `KPIS` or a dict of
+    name -> function(sim, sim_time); `tolerances` overrides
+    `DEFAULT_TOLERANCES` (KPIs without one only resolve on significance,
+    or when every paired difference is zero).
+
+    Intervals are checked after `min_replications` pairs, then every
+    `look_every` pairs, and at `max_replications`. `spending` names the
+    alpha-spending function from `SPENDING_FUNCTIONS` that splits the error
+    rate 1 - confidence over those looks.
+    """
+
+    def __init__(self, scenario: Callable, baseline: dict, candidate: dict, sim_time: int = 60,
+                 kpis: Union[Sequence[str], Dict[str, Callable]] = ('on_time_rate', 'avg_delivery_time_min', 'utilization'),
+                 confidence: float = 0.95, tolerances: Optional[Dict[str, float]] = None,
+                 min_replications: int = 5, max_replications: int = 100, base_seed: int = 0,
+                 look_every: int = 5, spending: str = 'pocock'):
+        if min_replications < 3:
+            raise ValueError("min_replications must be at least 3")
+        if max_replications < min_replications:
+            raise ValueError("max_replications must be >= min_replications")
+        if not 0 < confidence < 1:
+            raise ValueError("confidence must be in (0, 1)")
+        if look_every < 1:
+            raise ValueError("look_every must be at least 1")
+        if spending not in SPENDING_FUNCTIONS:
+            raise ValueError("Unknown spending function %r (choose from: %s)"
+                             % (spending, ', '.join(sorted(SPENDING_FUNCTIONS))))
+        self.scenario = scenario
+        self.baseline = baseline
+        self.candidate = candidate
+        self.sim_time = sim_time
+        self.kpis = dict(kpis) if isinstance(kpis, dict) else {name: KPIS[name] for name in kpis}
+        self.confidence = confidence
+        self.tolerances = dict(DEFAULT_TOLERANCES)
+        self.tolerances.update(tolerances or {})
+        self.min_replications = min_replications
+        self.max_replications = max_replications
+        self.base_seed = base_seed
+        self.look_every = look_every
+        self.spending = spending
+        self._look_alphas = self._spend()
+
+    def run_replication(self, config: dict, seed) -> Dict[str, float]:
+        sim = self.scenario(seed, **config)
+        sim.run(until=self.sim_time)
+        return {name: float(fn(sim, self.sim_time)) for name, fn in self.kpis.items()}
+
+    @property
+    def look_schedule(self) -> List[int]:
+        """Replication counts at which the intervals are checked."""
+        schedule = list(range(self.min_replications, self.max_replications + 1, self.look_every))
+        if schedule[-1] != self.max_replications:
+            schedule.append(self.max_replications)
+        return schedule
+
+    def _spend(self) -> Dict[int, float]:
+        # error rate of each look: the increment of the spending function since the previous look
+        spend = SPENDING_FUNCTIONS[self.spending]
+        alpha = 1 - self.confidence
+        alphas, spent = {}, 0.0
+        for n in self.look_schedule:
+            total = spend(alpha, n / self.max_replications)
+            alphas[n] = max(0.0, total - spent)
+            spent = total
+        return alphas
+
+    def look_confidence(self, n: int) -> float:
+        """Interval level used at the look after `n` replications."""
+        return 1 - self._look_alphas[n]
+
+    def compare(self, baseline_samples: List[dict], candidate_samples: List[dict],
+                alpha: Optional[float] = None) -> Dict[str, KpiComparison]:
+        """Paired intervals at error rate `alpha` (default: this look's share of the spending)."""
+        n = len(baseline_samples)
+        if alpha is None:
+            alpha = self._look_alphas.get(n, 1 - self.confidence)
+        t = t_critical(alpha / 2, n - 1)
+        comparisons = {}
+        for name in self.kpis:
+            diffs = [c[name] - b[name] for b, c in zip(baseline_samples, candidate_samples)]
+            d = mean(diffs)
+            sd = stdev(diffs)
+            half = t * sd / math.sqrt(n) if sd else 0.0
+            comparisons[name] = KpiComparison(
+                name=name,
+                baseline_mean=mean(b[name] for b in baseline_samples),
+                candidate_mean=mean(c[name] for c in candidate_samples),
+                mean_diff=d,
+                ci_low=d - half,
+                ci_high=d + half,
+                tolerance=self.tolerances.get(name, 0.0),
+            )
+        return comparisons
+
+    def run(self) -> ReplicationResult:
+        baseline_samples, candidate_samples = [], []
+        comparisons = {}
+        for i in range(self.max_replications):
+            seed = self.base_seed + i
+            baseline_samples.append(self.run_replication(self.baseline, seed))
+            candidate_samples.append(self.run_replication(self.candidate, seed))
+            if i + 1 not in self._look_alphas:
+                continue
+            comparisons = self.compare(baseline_samples, candidate_samples)
+            if all(c.resolved for c in comparisons.values()):
+                logger.info("Replications resolved after %s runs", i + 1)
+                return ReplicationResult(i + 1, 'resolved', comparisons, baseline_samples, candidate_samples)
+        logger.info("Replication budget of %s runs exhausted", self.max_replications)
+        return ReplicationResult(self.max_replications, 'budget', comparisons, baseline_samples, candidate_samples)
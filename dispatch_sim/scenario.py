@@ -0,0 +1,144 @@
+"""Bulk scenario import from CSV, JSONL and Parquet files.
+
+Every reader works in chunks of `chunk_size` records so large histories are
+streamed rather than loaded whole. Orders are handed to the engine as a lazy
+stream (`SimulationEngine.add_order_stream`): an `Order` object is only built
+when the simulation clock reaches its request_time, so order files must be
+sorted by request_time.
+
+Expected columns (coordinates may be `name_x`/`name_y` columns or, in JSONL,
+`name: [x, y]`; an order without a dropoff, or with only one of its two
+columns, raises ValueError instead of defaulting to the origin):
+
+- orders: id, request_time, pickup_x/y, dropoff_x/y, window_start, window_end, order_type
+- rider shifts: rider_id, online_time, offline_time, depot_id or location_x/y, capacity, star
+- depots: depot_id, x, y
+"""
+import csv
+import json
+import logging
+import os
+from typing import Dict, Iterator, List, Optional
+
+from .engine import SimulationEngine, Event
+from .models import Rider, Order, _optional_int
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 10000
+
+
+def detect_format(path: str, fmt: Optional[str] = None) -> str:
+    """Return 'csv', 'jsonl' or 'parquet' for `path`; an explicit `fmt` wins."""
+    if fmt:
+        return fmt.lower()
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        return 'csv'
+    if ext in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    if ext in ('.parquet', '.pq'):
+        return 'parquet'
+    raise ValueError("Cannot infer file format of %s; pass fmt='csv', 'jsonl' or 'parquet'" % path)
+
+
+def _chunks(rows, chunk_size: int) -> Iterator[List[dict]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _csv_rows(path: str):
+    with open(path, 'r', newline='', encoding='utf-8') as fh:
+        for row in csv.DictReader(fh):
+            yield {k: (v if v != '' else None) for k, v in row.items()}
+
+
+def _jsonl_rows(path: str):
+    with open(path, 'r', encoding='utf-8') as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _parquet_chunks(path: str, chunk_size: int) -> Iterator[List[dict]]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Reading Parquet requires pyarrow (pip install pyarrow)") from e
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+        yield batch.to_pylist()
+
+
+def iter_record_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, fmt: Optional[str] = None) -> Iterator[List[dict]]:
+    """Yield lists of at most `chunk_size` plain dict records from `path`."""
+    fmt = detect_format(path, fmt)
+    if fmt == 'parquet':
+        return _parquet_chunks(path, chunk_size)
+    if fmt == 'csv':
+        return _chunks(_csv_rows(path), chunk_size)
+    if fmt == 'jsonl':
+        return _chunks(_jsonl_rows(path), chunk_size)
+    raise ValueError("Unsupported format %r" % fmt)
+
+
+def iter_orders(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, fmt: Optional[str] = None) -> Iterator[Order]:
+    """Lazily build orders from `path`, one chunk of records at a time."""
+    for chunk in iter_record_chunks(path, chunk_size, fmt):
+        for record in chunk:
+            yield Order.from_dict(record)
+
+
+def load_orders(engine: SimulationEngine, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, fmt: Optional[str] = None):
+    """Stream orders from `path` into `engine` as the simulation reaches them."""
+    engine.add_order_stream(iter_orders(path, chunk_size, fmt))
+
+
+def load_depots(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, fmt: Optional[str] = None) -> Dict[str, tuple]:
+    """Return a mapping depot_id -> (x, y)."""
+    depots = {}
+    for chunk in iter_record_chunks(path, chunk_size, fmt):
+        for record in chunk:
+            depot_id = str(record.get('depot_id', record.get('id')))
+            depots[depot_id] = (float(record['x']), float(record['y']))
+    return depots
+
+
+def load_rider_shifts(engine: SimulationEngine, path: str, depots: Optional[Dict[str, tuple]] = None,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE, fmt: Optional[str] = None) -> List[Rider]:
+    """Register riders and schedule their online/offline events.
+
+    Each record is one shift; a rider with several shifts appears on several
+    records sharing the same rider_id. Riders based at a depot take its
+    location as both start and base location.
+    """
+    depots = depots or {}
+    riders: Dict[str, Rider] = {}
+    for chunk in iter_record_chunks(path, chunk_size, fmt):
+        for record in chunk:
+            rider_id = str(record.get('rider_id', record.get('id')))
+            rider = riders.get(rider_id)
+            if rider is None:
+                record = dict(record, id=rider_id)
+                depot_id = record.get('depot_id')
+                if depot_id is not None:
+                    if str(depot_id) not in depots:
+                        raise ValueError("Rider %s references unknown depot %s" % (rider_id, depot_id))
+                    record['location'] = record['base_location'] = depots[str(depot_id)]
+                rider = Rider.from_dict(record)
+                riders[rider_id] = rider
+                engine.add_rider(rider)
+            online = _optional_int(record.get('online_time'))
+            offline = _optional_int(record.get('offline_time'))
+            if online is not None:
+                engine.schedule_event(Event(online, 'rider_online', rider))
+            if offline is not None:
+                engine.schedule_event(Event(offline, 'rider_offline', rider))
+    logger.info("Loaded %s riders from %s", len(riders), path)
+    return list(riders.values())
@@ -1,3 +1,4 @@
+import random
 import unittest
 from dispatch_sim.engine import SimulationEngine, Event
 from dispatch_sim.models import Rider, Order, OrderStatus, RiderState
@@ -49,6 +50,28 @@ class TestSimulationEngine(unittest.TestCase):
         self.assertEqual(rider2.state, RiderState.IDLE)
         self.assertTrue(self.rider.online)
         self.assertTrue(rider2.online)
+    def test_pending_orders_match_full_scan(self):
+        # the open-order list must hand the scheduler the same orders, in the
+        # same order, as scanning every order in insertion order
+        sim = SimulationEngine(start_minute=0, end_minute=60, strategy='greedy')
+        for i in range(3):
+            sim.add_rider(Rider(id='r%d' % i, capacity=2), online=True)
+        rng = random.Random(7)
+        for i in range(60):
+            sim.add_order(Order(id='o%d' % i, dropoff=(rng.uniform(0, 3), rng.uniform(0, 3)),
+                                request_time=rng.randint(0, 20), window_end=rng.randint(20, 40)))
+        dispatch = sim.scheduler.dispatch
+        seen = []
+
+        def checked(pending, current_time):
+            expected = [o for o in sim.orders if o.status == OrderStatus.PENDING and o.request_time <= current_time]
+            self.assertEqual([o.id for o in pending], [o.id for o in expected])
+            seen.append(len(pending))
+            return dispatch(pending, current_time)
+
+        sim.scheduler.dispatch = checked
+        sim.run(until=60)
+        self.assertTrue(any(n > 1 for n in seen))
 
 if __name__ == '__main__':
     unittest.main()
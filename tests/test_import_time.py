@@ -0,0 +1,56 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+# Budget for `import dispatch_sim` in a fresh interpreter (best of several runs).
+# Greedy-only runs must not pay for OR-Tools or other solver imports.
+IMPORT_BUDGET_SECONDS = 0.2
+RUNS = 5
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+PROBE = """
+import builtins, json, logging, sys, time
+sys.path.insert(0, sys.argv[1])  # stub 'ortools' package that records being imported
+t0 = time.perf_counter()
+import dispatch_sim
+elapsed = time.perf_counter() - t0
+import dispatch_sim.cli
+from dispatch_sim.engine import SimulationEngine
+SimulationEngine(strategy='greedy').run(until=10)
+print(json.dumps({
+    'elapsed': elapsed,
+    'ortools_imported': getattr(builtins, '_ORTOOLS_STUB_IMPORTED', False),
+    'root_handlers': len(logging.getLogger().handlers),
+}))
+"""
+
+
+def probe():
+    with tempfile.TemporaryDirectory() as stub_dir:
+        os.mkdir(os.path.join(stub_dir, 'ortools'))
+        with open(os.path.join(stub_dir, 'ortools', '__init__.py'), 'w') as fh:
+            fh.write("import builtins\nbuiltins._ORTOOLS_STUB_IMPORTED = True\n")
+        out = subprocess.run([sys.executable, '-c', PROBE, stub_dir], cwd=PROJECT_ROOT, check=True,
+                             stdout=subprocess.PIPE, universal_newlines=True).stdout
+    return json.loads(out)
+
+
+class TestImportTime(unittest.TestCase):
+    def test_import_within_budget(self):
+        results = [probe() for _ in range(RUNS)]
+        best = min(r['elapsed'] for r in results)
+        self.assertLess(best, IMPORT_BUDGET_SECONDS,
+                        "import dispatch_sim took %.3fs (budget %.3fs)" % (best, IMPORT_BUDGET_SECONDS))
+
+    def test_import_has_no_side_effects(self):
+        result = probe()
+        self.assertFalse(result['ortools_imported'])
+        self.assertEqual(result['root_handlers'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
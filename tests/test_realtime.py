@@ -0,0 +1,197 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from dispatch_sim.engine import SimulationEngine
+from dispatch_sim.models import OrderStatus, Rider
+from dispatch_sim.realtime import RealtimeRunner, JsonlTailSource, QueueSource, open_unix_source
+
+# one simulated minute per 10ms of wall time
+SPEEDUP = 6000.0
+
+
+def collect(runner, until, delay=0.0):
+    async def consume(out):
+        async for d in runner.iter_decisions():
+            out.append(d)
+            if delay:
+                await asyncio.sleep(delay)
+
+    async def main():
+        out = []
+        metrics, _ = await asyncio.gather(runner.run(until=until), consume(out))
+        return metrics, out
+
+    return asyncio.run(main())
+
+
+async def collect_async(runner):
+    return [d async for d in runner.iter_decisions()]
+
+
+class TestRealtimeRunner(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.records = [
+            {'type': 'rider', 'id': 'r1', 'location': [0.0, 0.0], 'capacity': 2, 'online': True},
+            {'type': 'order', 'id': 'o1', 'dropoff': [1.0, 1.0], 'window_end': 15},
+            {'type': 'order', 'id': 'o2', 'time': 10, 'dropoff': [2.0, 2.0], 'window_end': 30},
+        ]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_jsonl(self, records):
+        path = os.path.join(self.tmpdir.name, 'feed.jsonl')
+        with open(path, 'w') as fh:
+            for rec in records:
+                fh.write(json.dumps(rec) + '\n')
+        return path
+
+    def test_jsonl_replay_emits_paced_decisions(self):
+        sim = SimulationEngine(start_minute=0, end_minute=60, strategy='greedy')
+        runner = RealtimeRunner(sim, JsonlTailSource(self.write_jsonl(self.records)), speedup=SPEEDUP)
+        metrics, decisions = collect(runner, until=40)
+        self.assertEqual([d['order_ids'] for d in decisions], [['o1'], ['o2']])
+        self.assertEqual([d['rider_id'] for d in decisions], ['r1', 'r1'])
+        # o2 is held back until its release minute
+        self.assertEqual(decisions[0]['time'], 0)
+        self.assertEqual(decisions[1]['time'], 10)
+        self.assertEqual(metrics.summary()['total_deliveries_count'], 2)
+        self.assertTrue(all(o.status == OrderStatus.COMPLETED for o in sim.orders))
+
+    def test_backpressure_keeps_every_decision(self):
+        records = [{'type': 'rider', 'id': 'r%d' % i, 'capacity': 1, 'online': True} for i in range(5)]
+        records += [{'type': 'order', 'id': 'o%d' % i, 'dropoff': [0.5, 0.5], 'window_end': 60} for i in range(5)]
+        sim = SimulationEngine(start_minute=0, end_minute=60, strategy='greedy')
+        runner = RealtimeRunner(sim, JsonlTailSource(self.write_jsonl(records)), speedup=SPEEDUP,
+                                max_buffered=1, decision_buffer=1)
+        _, decisions = collect(runner, until=20, delay=0.02)
+        assigned = sorted(oid for d in decisions for oid in d['order_ids'])
+        self.assertEqual(assigned, ['o%d' % i for i in range(5)])
+
+    def test_metrics_only_run_needs_no_consumer(self):
+        sim = SimulationEngine(start_minute=0, end_minute=60, strategy='greedy')
+        runner = RealtimeRunner(sim, JsonlTailSource(self.write_jsonl(self.records)), speedup=SPEEDUP,
+                                decision_buffer=1, emit_decisions=False)
+
+        async def main():
+            metrics = await asyncio.wait_for(runner.run(until=40), timeout=5)
+            return metrics, await collect_async(runner)
+
+        metrics, decisions = asyncio.run(main())
+        self.assertEqual(metrics.summary()['total_deliveries_count'], 2)
+        self.assertEqual(decisions, [])
+
+    def test_queue_source_rider_offline(self):
+        async def main():
+            queue = asyncio.Queue()
+            sim = SimulationEngine(start_minute=0, end_minute=60, strategy='greedy')
+            runner = RealtimeRunner(sim, QueueSource(queue), speedup=SPEEDUP)
+            await queue.put({'type': 'rider', 'id': 'r1', 'online': True})
+            await queue.put({'type': 'rider_offline', 'rider_id': 'r1', 'time': 2})
+            await queue.put({'type': 'order', 'id': 'o1', 'time': 3, 'dropoff': [1.0, 1.0]})
+            await queue.put(None)
+            out = []
+
+            async def consume():
+                async for d in runner.iter_decisions():
+                    out.append(d)
+
+            await asyncio.gather(runner.run(until=10), consume())
+            return sim, out
+
+        sim, decisions = asyncio.run(main())
+        self.assertEqual(decisions, [])
+        self.assertFalse(sim.riders[0].online)
+        self.assertEqual(sim.orders[0].status, OrderStatus.PENDING)
+
+    def test_malformed_records_are_skipped(self):
+        records = self.records[:1] + [
+            {'type': 'order', 'id': 'short', 'dropoff': [1]},
+            {'type': 'order', 'id': 'text', 'dropoff': 'xy'},
+            {'type': 'order', 'id': 'late', 'time': 'soon', 'dropoff': [1.0, 1.0]},
+            ['not', 'a', 'record'],
+        ] + self.records[1:]
+        sim = SimulationEngine(start_minute=0, end_minute=60, strategy='greedy')
+        runner = RealtimeRunner(sim, JsonlTailSource(self.write_jsonl(records)), speedup=SPEEDUP)
+        with self.assertLogs('dispatch_sim.realtime', level='WARNING') as logs:
+            _, decisions = collect(runner, until=40)
+        self.assertEqual(len(logs.records), 4)
+        self.assertEqual([d['order_ids'] for d in decisions], [['o1'], ['o2']])
+
+    def test_failure_still_ends_decision_stream(self):
+        sim = SimulationEngine(start_minute=0, end_minute=60, strategy='greedy')
+
+        def fail_on_o2(time_minute, rider, orders):
+            if any(o.id == 'o2' for o in orders):
+                raise RuntimeError("hook failed")
+
+        sim.assignment_hooks.append(fail_on_o2)
+        runner = RealtimeRunner(sim, JsonlTailSource(self.write_jsonl(self.records)), speedup=SPEEDUP)
+
+        async def consume(out):
+            async for d in runner.iter_decisions():
+                out.append(d)
+
+        async def main():
+            out = []
+            results = await asyncio.wait_for(
+                asyncio.gather(runner.run(until=20), consume(out), return_exceptions=True), timeout=5)
+            return results, out
+
+        (run_result, _), decisions = asyncio.run(main())
+        self.assertIsInstance(run_result, RuntimeError)
+        self.assertEqual([d['order_ids'] for d in decisions], [['o1']])
+
+    def test_records_arriving_during_wait_are_kept(self):
+        async def main():
+            queue = asyncio.Queue()
+            sim = SimulationEngine(start_minute=0, end_minute=60, strategy='greedy')
+            sim.add_rider(Rider(id='r1', capacity=10), online=True)
+            runner = RealtimeRunner(sim, QueueSource(queue), speedup=SPEEDUP)
+            consumer = asyncio.ensure_future(collect_async(runner))
+            run = asyncio.ensure_future(runner.run(until=15))
+            for i in range(20):
+                await queue.put({'type': 'order', 'id': 'o%d' % i, 'dropoff': [0.1 * i, 0.1]})
+                await asyncio.sleep(0.003 * (i % 4))
+            await queue.put(None)
+            await run
+            await consumer
+            return sim
+
+        sim = asyncio.run(main())
+        self.assertEqual([o.id for o in sim.orders], ['o%d' % i for i in range(20)])
+
+    @unittest.skipUnless(hasattr(asyncio, 'start_unix_server'), "requires Unix sockets")
+    def test_unix_socket_source(self):
+        sock_path = os.path.join(self.tmpdir.name, 'feed.sock')
+        payload = ''.join(json.dumps(r) + '\n' for r in self.records[:2]).encode('utf-8')
+
+        async def serve(reader, writer):
+            writer.write(payload)
+            await writer.drain()
+            writer.close()
+
+        async def main():
+            server = await asyncio.start_unix_server(serve, path=sock_path)
+            sim = SimulationEngine(start_minute=0, end_minute=60, strategy='greedy')
+            runner = RealtimeRunner(sim, await open_unix_source(sock_path), speedup=SPEEDUP)
+            out = []
+
+            async def consume():
+                async for d in runner.iter_decisions():
+                    out.append(d)
+
+            await asyncio.gather(runner.run(until=20), consume())
+            server.close()
+            await server.wait_closed()
+            return out
+
+        decisions = asyncio.run(main())
+        self.assertEqual([d['order_ids'] for d in decisions], [['o1']])
+
+
+if __name__ == '__main__':
+    unittest.main()
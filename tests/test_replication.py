@@ -0,0 +1,147 @@
+import unittest
+from dispatch_sim.cli import build_demo_scenario
+from dispatch_sim.engine import SimulationEngine, Event
+from dispatch_sim.models import Rider, Order
+from dispatch_sim.replication import KpiComparison, ReplicationController, fleet_utilization, random_stream, t_critical, t_quantile
+
+
+def fleet_scenario(seed, num_riders=2):
+    sim = SimulationEngine(start_minute=0, end_minute=60, strategy='greedy')
+    for _ in range(num_riders):
+        rider = Rider(location=(0.0, 0.0), base_location=(0.0, 0.0), capacity=2)
+        sim.add_rider(rider)
+        sim.schedule_event(Event(0, 'rider_online', rider))
+    rng = random_stream(seed, 'orders')
+    for _ in range(rng.randint(5, 15)):
+        at = rng.randint(0, 40)
+        sim.add_order(Order(dropoff=(rng.uniform(0, 4), rng.uniform(0, 4)), request_time=at, window_start=at, window_end=at + 10))
+    return sim
+
+
+def alternating_scenario(seed, flip=False):
+    # paired difference in order count is +1/-1 on odd/even seeds: mean ~0, never resolvable
+    sim = SimulationEngine(start_minute=0, end_minute=60, strategy='greedy')
+    for _ in range((seed + flip) % 2):
+        sim.add_order(Order(dropoff=(1.0, 1.0)))
+    return sim
+
+
+def null_scenario(seed, salt):
+    # both configurations draw order counts from independent streams with the same
+    # distribution: the true difference is zero but every paired difference is noisy
+    sim = SimulationEngine(start_minute=0, end_minute=60, strategy='greedy')
+    rng = random_stream('%s-%s' % (seed, salt), 'orders')
+    for _ in range(rng.randint(0, 20)):
+        sim.add_order(Order(request_time=61))
+    return sim
+
+
+class TestReplicationController(unittest.TestCase):
+    def test_t_quantile(self):
+        self.assertAlmostEqual(t_quantile(0.975, 1), 12.706, places=3)
+        self.assertAlmostEqual(t_quantile(0.995, 2), 9.925, places=3)
+        self.assertAlmostEqual(t_quantile(0.975, 4), 2.776, places=3)
+        self.assertAlmostEqual(t_quantile(0.975, 29), 2.045, places=3)
+        self.assertAlmostEqual(t_quantile(0.025, 29), -2.045, places=3)
+        # far tails used by early looks are computed on the tail, not on 1 - p
+        self.assertAlmostEqual(t_critical(0.0005, 4), 8.610, places=3)
+        self.assertGreater(t_critical(1e-20, 4), 1e4)
+
+    def test_utilization_counts_open_busy_periods(self):
+        sim = SimulationEngine(start_minute=0, end_minute=60, strategy='greedy')
+        sim.add_rider(Rider(capacity=1), online=True)
+        sim.add_rider(Rider(capacity=1), online=True)
+        # 5 minutes out and 5 back: one busy period of 10 minutes, still open at minute 6
+        sim.add_order(Order(dropoff=(5.0, 0.0), request_time=0))
+        sim.run(until=6)
+        self.assertEqual(sim.metrics.rider_busy_time, {})
+        self.assertAlmostEqual(fleet_utilization(sim, 6), 6 / 12)
+        sim.run(until=20)
+        self.assertAlmostEqual(fleet_utilization(sim, 20), 10 / 40)
+
+    def test_common_random_numbers(self):
+        controller = ReplicationController(build_demo_scenario, {'strategy': 'greedy'}, {'strategy': 'greedy'})
+        first = controller.run_replication({'strategy': 'greedy'}, seed=7)
+        again = controller.run_replication({'strategy': 'greedy'}, seed=7)
+        self.assertEqual(first, again)
+        a = build_demo_scenario(seed=7)
+        b = build_demo_scenario(seed=7)
+        self.assertEqual([o.request_time for o in a.orders], [o.request_time for o in b.orders])
+
+    def test_identical_configs_resolve_at_minimum(self):
+        controller = ReplicationController(build_demo_scenario, {'strategy': 'greedy'}, {'strategy': 'greedy'},
+                                           min_replications=4, max_replications=20)
+        result = controller.run()
+        self.assertEqual(result.stop_reason, 'resolved')
+        self.assertEqual(result.replications, 4)
+        for c in result.comparisons.values():
+            self.assertEqual(c.mean_diff, 0.0)
+            self.assertFalse(c.significant)
+
+    def test_detects_real_difference(self):
+        controller = ReplicationController(fleet_scenario, {'num_riders': 1}, {'num_riders': 4},
+                                           kpis=['utilization'], tolerances={'utilization': 0.0},
+                                           min_replications=5, max_replications=30)
+        result = controller.run()
+        self.assertEqual(result.stop_reason, 'resolved')
+        util = result.comparisons['utilization']
+        self.assertTrue(util.significant)
+        self.assertLess(util.mean_diff, 0)
+        self.assertEqual(result.summary()['replications'], result.replications)
+
+    def test_budget_stop(self):
+        controller = ReplicationController(alternating_scenario, {}, {'flip': True},
+                                           kpis={'orders': lambda sim, t: len(sim.orders)},
+                                           min_replications=3, max_replications=6)
+        result = controller.run()
+        self.assertEqual(result.stop_reason, 'budget')
+        self.assertEqual(len(result.baseline_samples), 6)
+
+    def test_false_positive_rate_under_null(self):
+        trials = 200
+        false_positives = 0
+        for trial in range(trials):
+            controller = ReplicationController(null_scenario, {'salt': 'a'}, {'salt': 'b'},
+                                               kpis={'orders': lambda sim, t: len(sim.orders)},
+                                               tolerances={'orders': 0.0}, min_replications=5,
+                                               max_replications=30, base_seed=trial * 1000)
+            if controller.run().comparisons['orders'].significant:
+                false_positives += 1
+        # nominal 5%; spending the error rate over the looks keeps the rate at or below it
+        self.assertLessEqual(false_positives / trials, 0.05)
+
+    def test_error_rate_is_spent_over_planned_looks(self):
+        controller = ReplicationController(build_demo_scenario, {}, {}, min_replications=5,
+                                           max_replications=52, look_every=5)
+        self.assertEqual(controller.look_schedule, [5, 10, 15, 20, 25, 30, 35, 40, 45, 50, 52])
+        spent = sum(1 - controller.look_confidence(n) for n in controller.look_schedule)
+        self.assertAlmostEqual(spent, 0.05)
+        # Pocock-type spending front-loads the error rate; O'Brien-Fleming-type holds it back
+        pocock = [1 - controller.look_confidence(n) for n in controller.look_schedule]
+        self.assertGreater(pocock[0], pocock[1])
+        obf = ReplicationController(build_demo_scenario, {}, {}, max_replications=52, spending='obrien-fleming')
+        self.assertLess(1 - obf.look_confidence(5), 1e-6)
+        self.assertAlmostEqual(sum(1 - obf.look_confidence(n) for n in obf.look_schedule), 0.05)
+
+    def test_equivalence_requires_interval_within_tolerance(self):
+        # half-width 0.01 equals the tolerance, but the interval reaches 0.018
+        c = KpiComparison('on_time_rate', 0.5, 0.508, 0.008, -0.002, 0.018, tolerance=0.01)
+        self.assertFalse(c.significant)
+        self.assertFalse(c.equivalent)
+        self.assertFalse(c.resolved)
+        inside = KpiComparison('on_time_rate', 0.5, 0.502, 0.002, -0.006, 0.009, tolerance=0.01)
+        self.assertTrue(inside.equivalent)
+
+    def test_validates_arguments(self):
+        with self.assertRaises(ValueError):
+            ReplicationController(build_demo_scenario, {}, {}, min_replications=2)
+        with self.assertRaises(ValueError):
+            ReplicationController(build_demo_scenario, {}, {}, min_replications=10, max_replications=5)
+        with self.assertRaises(ValueError):
+            ReplicationController(build_demo_scenario, {}, {}, look_every=0)
+        with self.assertRaises(ValueError):
+            ReplicationController(build_demo_scenario, {}, {}, spending='bonferroni')
+
+
+if __name__ == '__main__':
+    unittest.main()
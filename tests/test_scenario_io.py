@@ -0,0 +1,153 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+from dispatch_sim.engine import SimulationEngine, Event
+from dispatch_sim.models import Order, OrderStatus, Rider, RiderState
+from dispatch_sim.scenario import iter_record_chunks, load_orders, load_depots, load_rider_shifts
+from dispatch_sim.export import ColumnarWriter, ORDER_COLUMNS, export_orders, export_results, order_row, OrderOutcomeExporter
+
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+class TestScenarioImport(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.dir = self.tmpdir.name
+        self.orders_csv = self.write_csv('orders.csv', [
+            ['id', 'request_time', 'dropoff_x', 'dropoff_y', 'window_start', 'window_end', 'order_type'],
+            ['o1', '1', '1.0', '1.0', '1', '15', 'immediate'],
+            ['o2', '2', '2.0', '2.0', '', '', 'immediate'],
+            ['o3', '30', '1.0', '0.0', '30', '45', 'appointment'],
+        ])
+        self.depots_csv = self.write_csv('depots.csv', [['depot_id', 'x', 'y'], ['d1', '0.5', '0.5']])
+        self.shifts_jsonl = os.path.join(self.dir, 'shifts.jsonl')
+        with open(self.shifts_jsonl, 'w') as fh:
+            fh.write(json.dumps({'rider_id': 'r1', 'depot_id': 'd1', 'capacity': 2, 'online_time': 0, 'offline_time': 20}) + '\n')
+            fh.write(json.dumps({'rider_id': 'r1', 'online_time': 25}) + '\n')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_csv(self, name, rows):
+        path = os.path.join(self.dir, name)
+        with open(path, 'w', newline='') as fh:
+            csv.writer(fh).writerows(rows)
+        return path
+
+    def build(self):
+        sim = SimulationEngine(start_minute=0, end_minute=60, strategy='greedy')
+        depots = load_depots(self.depots_csv)
+        riders = load_rider_shifts(sim, self.shifts_jsonl, depots=depots)
+        load_orders(sim, self.orders_csv, chunk_size=2)
+        return sim, riders
+
+    def test_chunked_reading(self):
+        chunks = list(iter_record_chunks(self.orders_csv, chunk_size=2))
+        self.assertEqual([len(c) for c in chunks], [2, 1])
+        self.assertIsNone(chunks[0][1]['window_end'])
+
+    def test_missing_or_malformed_dropoff_is_rejected(self):
+        wrong_columns = self.write_csv('wrong.csv', [
+            ['id', 'request_time', 'x', 'y'],
+            ['o1', '1', '1.0', '1.0'],
+        ])
+        with self.assertRaises(ValueError):
+            load_orders(SimulationEngine(strategy='greedy'), wrong_columns)
+        for record in ({'dropoff_x': '1.0'}, {'dropoff': '12'}, {'dropoff': [1.0]}):
+            with self.assertRaises(ValueError):
+                Order.from_dict(record)
+        self.assertEqual(Order.from_dict({'dropoff': [1, 2]}).pickup, (0.0, 0.0))
+
+    def test_orders_are_streamed_lazily(self):
+        sim, _ = self.build()
+        # only the head of the stream is built before the run
+        self.assertEqual(sim.orders, [])
+        sim.run(until=10)
+        self.assertEqual([o.id for o in sim.orders], ['o1', 'o2'])
+        sim.run(until=60)
+        self.assertEqual([o.id for o in sim.orders], ['o1', 'o2', 'o3'])
+
+    def test_unsorted_stream_is_rejected(self):
+        sim = SimulationEngine(start_minute=0, end_minute=60, strategy='greedy')
+        rider = Rider(capacity=3)
+        sim.add_rider(rider, online=True)
+        sim.schedule_event(Event(5, 'rider_offline', rider))
+        sim.schedule_event(Event(8, 'rider_online', rider))
+        sim.add_order_stream(Order(id=oid, request_time=t, dropoff=(1.0, 1.0)) for oid, t in [('a', 1), ('b', 20), ('c', 3)])
+        with self.assertRaises(ValueError):
+            sim.run(until=60)
+        self.assertNotIn('c', [o.id for o in sim.orders])
+
+    def test_shifts_and_depots(self):
+        sim, riders = self.build()
+        self.assertEqual(len(riders), 1)
+        rider = riders[0]
+        self.assertEqual(rider.base_location, (0.5, 0.5))
+        sim.run(until=60)
+        self.assertTrue(all(o.status == OrderStatus.COMPLETED for o in sim.orders))
+        self.assertEqual(rider.state, RiderState.IDLE)
+        events = [e['event'] for e in sim.metrics.rider_timeline]
+        self.assertEqual(events.count('online'), 2)
+        self.assertEqual(events.count('offline'), 1)
+
+    def test_csv_export(self):
+        sim, _ = self.build()
+        sim.run(until=60)
+        paths = export_results(sim, os.path.join(self.dir, 'out'), fmt='csv', batch_size=2)
+        with open(paths['orders'], newline='') as fh:
+            rows = list(csv.DictReader(fh))
+        self.assertEqual([r['order_id'] for r in rows], ['o1', 'o2', 'o3'])
+        self.assertEqual(rows[0]['status'], 'completed')
+        self.assertEqual(rows[0]['assigned_rider'], 'r1')
+        self.assertEqual(rows[1]['on_time'], '')
+        with open(paths['rider_timeline'], newline='') as fh:
+            timeline = list(csv.DictReader(fh))
+        self.assertEqual(len(timeline), len(sim.metrics.rider_timeline))
+        assigned = [r for r in timeline if r['event'] == 'assigned']
+        self.assertIn('o1', assigned[0]['order_ids'].split(';'))
+
+    def test_streaming_order_export(self):
+        sim, _ = self.build()
+        path = os.path.join(self.dir, 'streamed.csv')
+        exporter = OrderOutcomeExporter(sim, path, batch_size=2)
+        sim.run(until=60)
+        self.assertEqual(exporter.close(), 3)
+        with open(path, newline='') as fh:
+            rows = list(csv.DictReader(fh))
+        self.assertEqual(sorted(r['order_id'] for r in rows), ['o1', 'o2', 'o3'])
+        self.assertTrue(all(r['status'] == 'completed' for r in rows))
+        self.assertEqual(sim.completion_hooks, [])
+
+    def test_export_empty(self):
+        path = os.path.join(self.dir, 'empty.csv')
+        self.assertEqual(export_orders([], path), 0)
+        with open(path) as fh:
+            self.assertTrue(fh.readline().startswith('order_id,'))
+
+    def test_close_twice_keeps_rows(self):
+        path = os.path.join(self.dir, 'twice.csv')
+        with ColumnarWriter(path, ORDER_COLUMNS) as writer:
+            writer.write_row(order_row(Order(id='o1', dropoff=(1.0, 1.0))))
+        writer.close()
+        with open(path, newline='') as fh:
+            self.assertEqual([r['order_id'] for r in csv.DictReader(fh)], ['o1'])
+
+    @unittest.skipUnless(PYARROW_AVAILABLE, "pyarrow not installed")
+    def test_parquet_round_trip(self):
+        import pyarrow.parquet as pq
+        orders = [Order(id='o%d' % i, request_time=i, dropoff=(1.0, 1.0)) for i in range(5)]
+        path = os.path.join(self.dir, 'orders.parquet')
+        self.assertEqual(export_orders(orders, path, batch_size=2), 5)
+        self.assertEqual(pq.ParquetFile(path).num_row_groups, 3)
+        loaded = [r['order_id'] for chunk in iter_record_chunks(path, chunk_size=2) for r in chunk]
+        self.assertEqual(loaded, ['o%d' % i for i in range(5)])
+
+
+if __name__ == '__main__':
+    unittest.main()
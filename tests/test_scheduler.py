@@ -2,6 +2,7 @@ import unittest
 from dispatch_sim.scheduler import Scheduler
 from dispatch_sim.models import Rider, Order, OrderStatus, RiderState
 from dispatch_sim.path_planner import PathPlanner
+from dispatch_sim import backends
 
 class TestScheduler(unittest.TestCase):
     def setUp(self):
@@ -52,5 +53,53 @@ class TestScheduler(unittest.TestCase):
         self.assertEqual(len(self.riders[0].assigned_orders), 0)
         self.assertEqual(len(self.riders[1].assigned_orders), 0)
 
+    def test_dispatch_shared_dropoff(self):
+        orders = [
+            Order(pickup=(0.0, 0.0), dropoff=(1.0, 1.0), request_time=0, window_start=0, window_end=10, status=OrderStatus.PENDING),
+            Order(pickup=(0.0, 0.0), dropoff=(1.0, 1.0), request_time=0, window_start=0, window_end=10, status=OrderStatus.PENDING),
+        ]
+        Scheduler(self.riders, self.planner, strategy='greedy').dispatch(orders, current_time=0)
+        self.assertEqual([o.id for o in self.riders[0].assigned_orders], [o.id for o in orders])
+
+    def register(self, name, target, requires=()):
+        backends.register_backend(name, target, requires=requires)
+        self.addCleanup(backends.unregister_backend, name)
+
+    def test_custom_backend(self):
+        calls = []
+
+        def first_rider(scheduler, orders, current_time):
+            calls.append(current_time)
+            return [(scheduler.riders[1], orders)]
+
+        self.register('test_first_rider', first_rider)
+        scheduler = Scheduler(self.riders, self.planner, strategy='test_first_rider')
+        order = Order(pickup=(0.0, 0.0), dropoff=(1.0, 1.0), request_time=0, window_start=0, window_end=10, status=OrderStatus.PENDING)
+        assignments = scheduler.dispatch([order], current_time=3)
+        self.assertEqual(calls, [3])
+        self.assertIs(assignments[0][0], self.riders[1])
+
+    def test_unknown_strategy_rejected(self):
+        with self.assertRaises(ValueError):
+            Scheduler(self.riders, self.planner, strategy='greddy')
+
+    def test_unavailable_strategy_rejected(self):
+        self.register('test_needs_missing_dep', 'dispatch_sim.backends.greedy:dispatch', requires=('no_such_dependency_xyz',))
+        with self.assertRaises(ImportError):
+            Scheduler(self.riders, self.planner, strategy='test_needs_missing_dep')
+        self.assertNotIn('test_needs_missing_dep', backends.available_backends())
+
+    def test_solver_failure_falls_back_to_greedy(self):
+        def broken(scheduler, orders, current_time):
+            raise RuntimeError("solver crashed")
+
+        self.register('test_broken', broken)
+        scheduler = Scheduler(self.riders, self.planner, strategy='test_broken')
+        order = Order(pickup=(0.0, 0.0), dropoff=(1.0, 1.0), request_time=0, window_start=0, window_end=10, status=OrderStatus.PENDING)
+        with self.assertLogs('dispatch_sim.scheduler', level='ERROR'):
+            scheduler.dispatch([order], current_time=0)
+        self.assertEqual(order.assigned_rider, self.riders[0].id)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file